@@ -7,6 +7,7 @@ We are assuming that we have already linked a PSN profile to our Remote Play dev
 
 import asyncio
 import argparse
+import signal
 
 from pyremoteplay import RPDevice
 
@@ -64,26 +65,48 @@ async def runner(host, standby):
     # Now that we have connected to session we can run our task.
     asyncio.create_task(task(device))
 
-    # This is included to keep the asyncio loop running.
-    while device.connected:
-        try:
-            await asyncio.sleep(0)
-        except KeyboardInterrupt:
-            device.disconnect()
-            break
+    # Keep the asyncio loop running until the session stops.
+    try:
+        await device.session.stop_event.wait()
+    finally:
+        device.disconnect()
+
+
+async def run(hosts, standby):
+    """Run client for each host concurrently."""
+    tasks = asyncio.gather(*[runner(host, standby) for host in hosts])
+
+    # Cancel on Ctrl-C. Signal handlers are not available on Windows.
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGINT, tasks.cancel)
+    except NotImplementedError:
+        pass
+    try:
+        await tasks
+    except asyncio.CancelledError:
+        pass
 
 
 def main():
     parser = argparse.ArgumentParser(description="Async Remote Play Client.")
-    parser.add_argument("host", type=str, help="IP address of Remote Play host")
+    parser.add_argument(
+        "host", type=str, nargs="+", help="IP address of Remote Play host(s)"
+    )
     parser.add_argument(
         "-s", "--standby", action="store_true", help="Place host in standby"
     )
     args = parser.parse_args()
-    host = args.host
+    hosts = args.host
     standby = args.standby
-    loop = asyncio.get_event_loop()
-    loop.run_until_complete(runner(host, standby))
+    try:
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ModuleNotFoundError:
+        pass
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    loop.run_until_complete(run(hosts, standby))
 
 
 if __name__ == "__main__":
@@ -4,26 +4,57 @@ We are assuming that we have already linked a PSN profile to our Remote Play dev
 """
 
 import asyncio
+import concurrent.futures
 import threading
 import atexit
 
 from pyremoteplay import RPDevice
 from pyremoteplay.receiver import QueueReceiver
 
+_LOOP = None
+_THREAD = None
+_DEVICES = set()
 
-def stop(device, thread):
-    loop = device.session.loop
+
+def _get_loop():
+    """Return event loop running in a background thread. Started once per process."""
+    global _LOOP, _THREAD  # pylint: disable=global-statement
+    if _LOOP is None:
+        _LOOP = asyncio.new_event_loop()
+        _THREAD = threading.Thread(target=_LOOP.run_forever, daemon=True)
+        _THREAD.start()
+    return _LOOP
+
+
+async def _disconnect(device):
+    """Disconnect device in the thread of the loop."""
     device.disconnect()
-    loop.stop()
-    thread.join(3)
-    print("stopped")
 
 
-def worker(device):
-    loop = asyncio.new_event_loop()
-    task = loop.create_task(device.connect())
-    loop.run_until_complete(task)
-    loop.run_forever()
+def _teardown(device):
+    """Disconnect device. Stop the loop if no other devices are running."""
+    global _LOOP, _THREAD  # pylint: disable=global-statement
+    loop = _LOOP
+    # Wait for session to be torn down before the loop can be stopped.
+    future = asyncio.run_coroutine_threadsafe(_disconnect(device), loop)
+    try:
+        future.result(timeout=3)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        print("Timed out stopping Session")
+    if not _DEVICES:
+        loop.call_soon_threadsafe(loop.stop)
+        _THREAD.join(3)
+        _LOOP = _THREAD = None
+
+
+def stop(device):
+    """Stop session. Stops the loop after the last device is stopped."""
+    if device not in _DEVICES:
+        return
+    _DEVICES.discard(device)
+    _teardown(device)
+    print("stopped")
 
 
 def start(ip_address):
@@ -38,12 +69,21 @@ def start(ip_address):
         return None
     user = users[0]  # Gets first user name
     receiver = QueueReceiver()
-    device.create_session(user, receiver=receiver)
-    thread = threading.Thread(target=worker, args=(device,), daemon=True)
-    thread.start()
-    atexit.register(
-        lambda: stop(device, thread)
-    )  # Make sure we stop the thread on exit.
+    loop = _get_loop()
+    device.create_session(user, receiver=receiver, loop=loop)
+    future = asyncio.run_coroutine_threadsafe(device.connect(), loop)
+    try:
+        connected = future.result(timeout=10)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        print("Timed out starting Session")
+        connected = False
+    if not connected:
+        print("Failed to start Session")
+        _teardown(device)
+        return None
+    _DEVICES.add(device)
+    atexit.register(lambda: stop(device))  # Make sure we stop the session on exit.
 
     # Wait for session to be ready
     device.wait_for_session()
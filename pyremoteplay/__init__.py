@@ -1,3 +1,48 @@
 """Init file for pyremoteplay."""
-from . import register, oauth, profile, tracker, const, session
-from .device import RPDevice
+from __future__ import annotations
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .device import RPDevice
+
+_SUBMODULES = (
+    "av",
+    "const",
+    "controller",
+    "crypt",
+    "ddp",
+    "device",
+    "errors",
+    "keys",
+    "oauth",
+    "profile",
+    "protobuf",
+    "receiver",
+    "register",
+    "session",
+    "socket",
+    "stream",
+    "stream_packets",
+    "takion_pb2",
+    "tracker",
+    "util",
+)
+
+__all__ = [*_SUBMODULES, "RPDevice"]
+
+
+def __getattr__(name: str):
+    """Import submodules on first access."""
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    if name == "RPDevice":
+        from .device import RPDevice  # pylint: disable=import-outside-toplevel
+
+        return RPDevice
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    """Return attributes including submodules not yet imported."""
+    return sorted({*globals(), *__all__})
@@ -1,20 +1,26 @@
 """Main methods for pyyremoteplay"""
+from __future__ import annotations
 
 import argparse
 import asyncio
+import concurrent.futures
 import curses
 import logging
+import queue
 import sys
 import threading
-from collections import OrderedDict
 import socket
 import atexit
+from itertools import groupby
+from typing import TYPE_CHECKING
 
 from .ddp import search
-from .oauth import prompt as oauth_prompt
-from .profile import Profiles, format_user_account
-from .device import RPDevice
 from .__version__ import VERSION
+from .util import raise_thread_priority
+
+if TYPE_CHECKING:
+    from .device import RPDevice
+    from .profile import Profiles
 
 NEW_PROFILE = "New Profile"
 CANCEL = "Cancel"
@@ -47,6 +53,13 @@ def main():
         help="Test connecting to device with verbose logging",
     )
 
+    parser.add_argument(
+        "--poll-ms",
+        type=int,
+        default=CLIInstance.POLL_MS,
+        help="Interval in milliseconds to poll for key presses",
+    )
+
     ######## Just to show in help
     parser.add_argument(
         "-l",
@@ -67,21 +80,24 @@ def main():
     host = args.host
     should_register = args.register
     test = args.test
+    poll_ms = max(1, args.poll_ms)
 
     level = logging.DEBUG if test else logging.WARNING
     logging.basicConfig(level=level)
 
+    # Imported here so that -l and -v do not load the session stack.
+    from .device import RPDevice  # pylint: disable=import-outside-toplevel
+
     try:
-        socket.gethostbyname(host)
+        device = RPDevice(host)
     except socket.gaierror:
         print(f"\nError: Could not find host with address: {host}\n\n")
         parser.print_help()
         return
-    device = RPDevice(host)
     if should_register:
         register_profile(device)
         return
-    cli(device, test)
+    cli(device, test, poll_ms)
 
 
 def show_devices():
@@ -101,19 +117,17 @@ def select_profile(profiles: Profiles, use_single: bool, get_new: bool) -> str:
     """Return profile name."""
     name = NEW_PROFILE
     names = profiles.usernames
-    if names == 1 and use_single:
-        name = names[0]
-        return name
+    if len(names) == 1 and use_single:
+        return names[0]
     print("\nFound Profiles")
     if get_new:
         names.append(NEW_PROFILE)
     names.append(CANCEL)
-    prompt = ""
-    for _index, item in enumerate(names):
-        prompt = f"{prompt}{_index}: {item}\n"
+    prompt = "".join([f"{_index}: {item}\n" for _index, item in enumerate(names)])
+    sys.stdout.write(f"Select a profile to use:\n{prompt}")
     while True:
         try:
-            index = int(input(f"Select a profile to use:\n{prompt}>> "))
+            index = int(input(">> "))
         except (KeyboardInterrupt, EOFError):
             print("")
             sys.exit()
@@ -129,10 +143,17 @@ def select_profile(profiles: Profiles, use_single: bool, get_new: bool) -> str:
     return name
 
 
-def register_profile(device: RPDevice):
+def register_profile(device: RPDevice, status: dict = None):
     """Register with host."""
+    # pylint: disable=import-outside-toplevel
+    from .device import RPDevice
+    from .oauth import prompt as oauth_prompt
+    from .profile import format_user_account
+
     user = ""
-    status = device.get_status()
+    added = False
+    if status is None:
+        status = device.get_status()
     if not status:
         print("Host is not reachable")
         return
@@ -157,15 +178,26 @@ def register_profile(device: RPDevice):
             print("Error: Could not get user profile.")
             sys.exit()
         profiles.update_user(user_profile)
-        profiles.save()
         user = user_profile.name
+        added = True
         print(f"PSN User: {user} added.\n\n")
-    link_profile(device, user)
+    linked = False
+    try:
+        link_profile(device, user, profiles)
+        # Profiles are saved by register.
+        linked = True
+    finally:
+        # Keep a new user if linking fails or is interrupted.
+        if added and not linked:
+            profiles.save()
 
 
-def link_profile(device: RPDevice, user: str):
+def link_profile(device: RPDevice, user: str, profiles: Profiles = None):
     """Link User Profile with device."""
-    profiles = RPDevice.get_profiles()
+    if profiles is None:
+        from .device import RPDevice  # pylint: disable=import-outside-toplevel
+
+        profiles = RPDevice.get_profiles()
     user_profile = profiles.get_user_profile(user)
     if not user_profile:
         print(f"Profile not found for user: {user}")
@@ -175,14 +207,15 @@ def link_profile(device: RPDevice, user: str):
         _LOGGER.error("No User ID")
         sys.exit()
     pin = ""
+    sys.stdout.write(
+        f"On Remote Play host, Login to your PSN Account: {user}\n"
+        "Then go to Settings -> "
+        "Remote Play Connection Settings -> "
+        "Add Device and enter the PIN shown\n"
+    )
     while True:
         try:
-            pin = input(
-                f"On Remote Play host, Login to your PSN Account: {user}\n"
-                "Then go to Settings -> "
-                "Remote Play Connection Settings -> "
-                "Add Device and enter the PIN shown\n>> "
-            )
+            pin = input(">> ")
         except (KeyboardInterrupt, EOFError):
             print("")
             sys.exit()
@@ -191,14 +224,16 @@ def link_profile(device: RPDevice, user: str):
         print("Invalid PIN. PIN must be only 8 numbers\n")
     print("")
 
-    regist_profile = device.register(user, pin)
+    regist_profile = device.register(user, pin, profiles=profiles)
     if not regist_profile:
         print("Error: Registering with host.")
         sys.exit()
 
 
-def cli(device: RPDevice, test: bool = False):
+def cli(device: RPDevice, test: bool = False, poll_ms: int = 0):
     """Start CLI."""
+    from .device import RPDevice  # pylint: disable=import-outside-toplevel
+
     status = device.get_status()
     if not status:
         print(f"Could not reach host at: {device.host}")
@@ -206,12 +241,12 @@ def cli(device: RPDevice, test: bool = False):
     profiles = RPDevice.get_profiles()
     if profiles:
         user = select_profile(profiles, True, False)
-        if user not in device.get_users():
+        if user not in device.get_users(profiles):
             print(f"User: {user} not registered with this device.\n")
-            link_profile(device, user)
+            link_profile(device, user, profiles)
         if test:
             print("Starting test...\n")
-        setup_worker(device, user, test)
+        setup_worker(device, user, test, poll_ms)
     else:
         try:
             selection = input("No Profiles Found. Enter 'Y' to create profile.\n>> ")
@@ -220,27 +255,32 @@ def cli(device: RPDevice, test: bool = False):
             sys.exit()
         print("")
         if selection.upper() == "Y":
-            register_profile(device)
+            register_profile(device, status)
 
 
 def worker(device: RPDevice, user: str, event: threading.Event):
     """Worker."""
-    loop = asyncio.new_event_loop()
+    try:
+        import uvloop  # pylint: disable=import-outside-toplevel
+    except ModuleNotFoundError:
+        loop = asyncio.new_event_loop()
+    else:
+        loop = uvloop.new_event_loop()
+        _LOGGER.info("Using uvloop")
     device.create_session(user, loop=loop)
-    task = loop.create_task(async_start(device, event))
+    loop.create_task(async_start(device, event, loop))
     atexit.register(loop.stop)
-    loop.run_until_complete(task)
     loop.run_forever()
 
 
-def setup_worker(device: RPDevice, user: str, test: bool):
+def setup_worker(device: RPDevice, user: str, test: bool, poll_ms: int = 0):
     """Sync method for starting session."""
     event = threading.Event()
     thread = threading.Thread(target=worker, args=(device, user, event), daemon=True)
     thread.start()
     event.wait(timeout=5)
     if not test:
-        curses.wrapper(start, device)
+        curses.wrapper(start, device, poll_ms)
     else:
         result = "Pass" if device.session.is_ready else "Fail"
         loop = device.session.loop
@@ -249,28 +289,51 @@ def setup_worker(device: RPDevice, user: str, test: bool):
         print(f"\nTest Result: {result}\n")
 
 
-async def async_start(device: RPDevice, event: threading.Event):
+async def async_start(
+    device: RPDevice, event: threading.Event, loop: asyncio.AbstractEventLoop
+):
     """Start Session."""
-    loop = asyncio.get_running_loop()
-    started = await device.connect()
-    if not started:
-        loop.stop()
-        print(f"Session Failed to Start: {device.session.error}")
-    ready = await device.async_wait_for_session()
-    if not ready:
-        print("Timed out waiting for session to start")
-    event.set()
-
-
-def start(stdscr, device: RPDevice):
+    try:
+        started = await device.connect()
+        if not started:
+            loop.stop()
+            print(f"Session Failed to Start: {device.session.error}")
+            return
+        ready = await device.async_wait_for_session()
+        if not ready:
+            print("Timed out waiting for session to start")
+    finally:
+        # Wake up setup_worker as soon as the outcome is known.
+        event.set()
+
+
+def start(stdscr, device: RPDevice, poll_ms: int = 0):
     """Start Instance."""
-    instance = CLIInstance(device)
     if not device.session.is_ready:
         curses.endwin()
         return
+    instance = CLIInstance(device, poll_ms)
     instance.run(stdscr)
 
 
+def _get_mapping_runs(mapping: dict) -> tuple[tuple[str, int], ...]:
+    """Return mapping display as text and color pair number."""
+    runs = [("\n", 0)]
+    items = [("Key", "Action")]
+    items.extend(mapping.items())
+    for item, (key, value) in enumerate(items, start=1):
+        if key == "\n":
+            key = "KEY_ENTER"
+        runs.extend([(key, 5), (" : ", 0), (value, 4)])
+        runs.append(("\n", 0) if item % 4 == 0 else (" | ", 0))
+    runs.append(("\n\n", 0))
+    # Join neighbouring runs with the same color.
+    return tuple(
+        ("".join([text for text, _ in group]), color)
+        for color, group in groupby(runs, key=lambda run: run[1])
+    )
+
+
 class CLIInstance:
     """Emulated Keyboard."""
 
@@ -296,113 +359,249 @@ class CLIInstance:
         "p": "PS",
         "y": "TOUCHPAD",
     }
+    MAP_RUNS = _get_mapping_runs(MAP)
+
+    POLL_MS = 2
+    IDLE_POLL_MS = 50
+    RELEASE_TIMEOUT = 0.05
+    QUIT_TIMEOUT = 5.0
+
+    __slots__ = (
+        "_device",
+        "_session",
+        "_loop",
+        "controller",
+        "stdscr",
+        "last_key",
+        "map",
+        "_code_map",
+        "_pos",
+        "_poll_interval",
+        "_keys",
+        "_pending",
+        "_colors",
+        "_map_pad",
+        "_map_size",
+        "_width",
+        "_rendered",
+        "_actions",
+        "_lock",
+        "_stopped",
+    )
 
-    def __init__(self, device: RPDevice):
+    @staticmethod
+    def _key_code(key: str) -> int:
+        """Return character code for key name. Reverse of `getkey()`."""
+        if len(key) == 1:
+            return ord(key)
+        return getattr(curses, key)
+
+    def __init__(self, device: RPDevice, poll_ms: int = 0):
         self._device = device
-        self._loop = self._device.session.loop
+        self._session = self._device.session
+        self._loop = self._session.loop
         self.controller = self._device.controller
         self.stdscr = None
         self.last_key = None
         self.map = self.MAP
+        self._code_map = {self._key_code(key): value for key, value in self.map.items()}
         self._pos = (0, 0)
+        self._poll_interval = (poll_ms or self.POLL_MS) / 1000
+        self._keys = queue.SimpleQueue()
+        self._pending = []
+        self._colors: list[int] = []
+        self._map_pad = None
+        self._map_size = (0, 0)
+        self._width = 0
+        self._rendered = None
+        self._actions = {action: self._press for action in self.map.values()}
+        self._actions["QUIT"] = self._quit
+        self._actions["STANDBY"] = self._standby
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        # Events are removed once the session has stopped.
+        events = self._session.events
+        if events is None or self._session.is_stopped:
+            self._set_stopped()
+        else:
+            events.on("stop", self._set_stopped)
 
     def _init_color(self):
+        if self._colors:
+            return
         curses.start_color()
         curses.init_pair(1, curses.COLOR_WHITE, curses.COLOR_BLACK)
         curses.init_pair(2, curses.COLOR_CYAN, curses.COLOR_BLACK)
         curses.init_pair(3, curses.COLOR_MAGENTA, curses.COLOR_BLACK)
         curses.init_pair(4, curses.COLOR_YELLOW, curses.COLOR_BLACK)
         curses.init_pair(5, curses.COLOR_GREEN, curses.COLOR_BLACK)
+        self._colors = [curses.color_pair(pair) for pair in range(6)]
+
+    def _build_map_pad(self):
+        """Draw mapping into a pad once. Copied to the window on redraw."""
+        lines = "".join([text for text, _ in self.MAP_RUNS]).split("\n")
+        self._map_size = (len(lines), max(len(line) for line in lines) + 1)
+        self._map_pad = curses.newpad(*self._map_size)
+        for text, color in self.MAP_RUNS:
+            self._map_pad.addstr(text, self._colors[color])
 
     def _show_mapping(self):
-        self.stdscr.addstr("\n")
-        _key_mapping = OrderedDict()
-        _key_mapping.update({"Key": "Action"})
-        _key_mapping.update(self.map)
-        item = 0
-        for key, value in _key_mapping.items():
-            if key == "\n":
-                key = "KEY_ENTER"
-            self.stdscr.addstr(key, curses.color_pair(5))
-            self.stdscr.addstr(" : ")
-            self.stdscr.addstr(value, curses.color_pair(4))
-            item += 1
-            if item >= 4:
-                item = 0
-                self.stdscr.addstr("\n")
-            else:
-                self.stdscr.addstr(" | ")
-        self.stdscr.addstr("\n\n")
-        self._pos = self.stdscr.getyx()
+        max_y, max_x = self.stdscr.getmaxyx()
+        self._width = max_x
+        self._rendered = None
+        pos_y = self.stdscr.getyx()[0]
+        rows, cols = self._map_size
+        end_y = min(pos_y + rows, max_y) - 1
+        if end_y >= pos_y:
+            self._map_pad.overwrite(
+                self.stdscr, 0, 0, pos_y, 0, end_y, min(cols, max_x) - 1
+            )
+        self._pos = (max(min(pos_y + rows - 1, max_y - 2), 0), 0)
+        self.stdscr.move(*self._pos)
         self.stdscr.clrtobot()
-        self.stdscr.refresh()
 
     def _init_window(self):
         win_size = self.stdscr.getmaxyx()
         self.stdscr.setscrreg(self.stdscr.getyx()[0], win_size[0] - 1)
-        self.stdscr.clear()
-        self.stdscr.refresh()
+        self.stdscr.erase()
         self.stdscr.addstr(
             0,
             0,
             "Remote Play - Interactive mode, press 'q' to exit\n",
         )
         self._show_mapping()
+        self.stdscr.refresh()
+
+    def _poll_keys(self):
+        """Read keys into queue. Run in thread."""
+        raise_thread_priority()
+        idle_interval = max(self._poll_interval, self.IDLE_POLL_MS / 1000)
+        interval = self._poll_interval
+        while not self._stopped.is_set():
+            with self._lock:
+                char = self.stdscr.getch()
+            if char == -1:
+                # Back off while no keys are pressed.
+                self._stopped.wait(interval)
+                interval = min(interval * 2, idle_interval)
+                continue
+            interval = self._poll_interval
+            self._keys.put_nowait(char)
+
+    def _set_stopped(self):
+        """Callback for session stop. Wakes up waiting threads."""
+        self._stopped.set()
+        self._keys.put_nowait(-1)
+
+    def _get_keys(self) -> list[int]:
+        """Return all queued keys. Blocks until a key is queued or timeout."""
+        keys = [self._keys.get(timeout=self.RELEASE_TIMEOUT)]
+        while True:
+            try:
+                keys.append(self._keys.get_nowait())
+            except queue.Empty:
+                return keys
 
     def run(self, stdscr):
         """Run CLI Instance."""
         self.controller.start()
         self.stdscr = stdscr
         self._init_color()
+        self._build_map_pad()
         self.stdscr.scrollok(True)
         self._init_window()
-        timeout = 50
-        self.stdscr.timeout(timeout)
+        self.stdscr.nodelay(True)
         self.stdscr.clrtobot()
+        threading.Thread(target=self._poll_keys, daemon=True).start()
         _last = ""
-        while self._device.session.is_running:
-            self._init_window()
-            if _last:
-                self._write_str(_last, 5)
+        stopped = self._stopped
+        lock = self._lock
+        get_keys = self._get_keys
+        handle_key = self._handle_key
+        write_str = self._write_str
+        flush = self._flush
+        doupdate = curses.doupdate
+        key_resize = curses.KEY_RESIZE
+        while not stopped.is_set():
             try:
-                key = self._handle_key(self.stdscr.getkey())
-                if key:
-                    _last = key
-            except curses.error:
+                keys = get_keys()
+            except queue.Empty:
                 if self.last_key is not None:
-                    self.controller.button(self.last_key, "release")
+                    self._pending.append((self.last_key, "release"))
                     self.last_key = None
+                    flush()
+                continue
             except (KeyboardInterrupt, EOFError):
                 self.quit()
+            if stopped.is_set():
+                break
+            with lock:
+                for char in keys:
+                    if char == key_resize:
+                        self._init_window()
+                        if _last:
+                            write_str(_last, 5)
+                        continue
+                    key = handle_key(char)
+                    if key:
+                        _last = key
+                        write_str(key, 5)
+                flush()
+                doupdate()
 
     def _write_str(self, text, color=1):
-        self.stdscr.move(self._pos[0], self._pos[1])
-        self.stdscr.clrtobot()
-        self.stdscr.addstr(text, curses.color_pair(color))
-        self.stdscr.move(self._pos[0] + 1, self._pos[1])
-
-    def _handle_key(self, key):
-        key = self.map.get(key)
+        if self._rendered == (text, color):
+            return
+        self._rendered = (text, color)
+        pos_y, pos_x = self._pos
+        # Pad to the end of the line to overwrite the previous text.
+        text = text.ljust(self._width - pos_x)
+        self.stdscr.addstr(pos_y, pos_x, text, self._colors[color])
+        self.stdscr.move(pos_y + 1, pos_x)
+        self.stdscr.noutrefresh()
+
+    def _handle_key(self, char: int):
+        key = self._code_map.get(char)
         if key and self.last_key is None:
             self.last_key = key
-            if key == "QUIT":
-                self._write_str(key, 3)
-                self.stdscr.refresh()
-                self.quit()
-            elif key == "STANDBY":
-                self._write_str(key, 3)
-                self.stdscr.refresh()
-                self._device.session.standby()
-                self.quit()
-                # self._loop.call_soon_threadsafe(self._loop.stop)
-                # curses.endwin()
-                # sys.exit()
-            self.controller.button(key, "press")
+            self._actions[key](key)
         return key
 
-    def quit(self):
-        """Quit."""
+    def _press(self, key: str):
+        self._pending.append((key, "press"))
+
+    def _quit(self, key: str):
+        self._write_str(key, 3)
+        self.stdscr.refresh()
+        self.quit()
+
+    def _standby(self, key: str):
+        self._write_str(key, 3)
+        self.stdscr.refresh()
+        self.quit(standby=True)
+
+    def _flush(self):
+        """Send pending button events together."""
+        if self._pending:
+            # Transports are not thread safe. Send from the loop's thread.
+            self._loop.call_soon_threadsafe(
+                self.controller.button_events, self._pending
+            )
+            self._pending = []
+
+    async def _async_quit(self, standby: bool):
+        """Disconnect from the loop's thread."""
+        if standby:
+            await self._session.async_standby()
         self._device.disconnect()
+
+    def quit(self, standby: bool = False):
+        """Quit."""
+        future = asyncio.run_coroutine_threadsafe(self._async_quit(standby), self._loop)
+        try:
+            future.result(timeout=self.QUIT_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            _LOGGER.warning("Timed out disconnecting")
         self._loop.call_soon_threadsafe(self._loop.stop)
         curses.endwin()
         sys.exit()
@@ -1,12 +1,16 @@
 """AV for pyremoteplay."""
 from __future__ import annotations
+import abc
 import logging
+import threading
 import time
 from collections import deque
+from functools import lru_cache
 from typing import TYPE_CHECKING, Callable
 
 from .stream_packets import AVPacket, Packet
 from .const import FFMPEG_PADDING
+from .util import raise_thread_priority
 
 if TYPE_CHECKING:
     from .session import Session
@@ -14,10 +18,40 @@ if TYPE_CHECKING:
 
 _LOGGER = logging.getLogger(__name__)
 
+_PADDING = bytes(FFMPEG_PADDING)
+
+
+@lru_cache(maxsize=16)
+def _get_fec_matrix(src: int, fec: int):
+    """Return FEC Matrix. Matrix is only created once per src and fec length."""
+    import pyjerasure  # pylint: disable=import-outside-toplevel
+
+    return pyjerasure.Matrix("cauchy", src, fec, 8)
+
+
+def _get_set_bits(mask: int) -> tuple[int, ...]:
+    """Return indexes of set bits in mask in ascending order."""
+    indexes = []
+    while mask:
+        bit = mask & -mask
+        indexes.append(bit.bit_length() - 1)
+        mask ^= bit
+    return tuple(indexes)
+
 
 class AVHandler:
     """AV Handler."""
 
+    BATCH_SIZE = 8
+    WAIT_TIMEOUT = 0.1
+    CONGESTION_INTERVAL = 0.5
+    MAX_QUEUE_SIZE = 5000
+    # Session is stopped if more packets than this are dropped within the window.
+    MAX_QUEUE_OVERFLOWS = 1000
+    OVERFLOW_WINDOW = 1.0
+    # If True, raise priority of worker thread. Requires permission on Linux.
+    RAISE_PRIORITY = False
+
     def __del__(self):
         self._queue.clear()
 
@@ -26,11 +60,16 @@ class AVHandler:
         self._receiver = None
         self._v_stream = None
         self._a_stream = None
+        self._streams = {}
         self._cipher = None
-        self._queue = deque(maxlen=5000)
+        # Oldest packets are dropped when full.
+        self._queue = deque(maxlen=self.MAX_QUEUE_SIZE)
+        self._queue_event = threading.Event()
         self._worker = None
         self._last_congestion = 0
-        self._waiting = False
+        self._congestion_handle = None
+        self._overflow_count = 0
+        self._overflow_start = 0
 
     def add_receiver(self, receiver: AVReceiver):
         """Add AV reciever and run."""
@@ -50,82 +89,118 @@ class AVHandler:
     def set_headers(self, v_header: bytes, a_header: bytes):
         """Set headers."""
         if self._receiver:
-            self._v_stream = AVStream(
-                "video",
+            self._v_stream = VideoStream(
                 v_header,
                 self._receiver.handle_video_data,
                 self._send_corrupt,
             )
-            self._a_stream = AVStream(
-                "audio",
+            self._a_stream = AudioStream(
                 a_header,
                 self._receiver.handle_audio_data,
                 self._send_corrupt,
             )
+            # Updated in place as worker holds a reference.
+            self._streams.update(
+                {
+                    AVPacket.Type.VIDEO: self._v_stream.handle,
+                    AVPacket.Type.AUDIO: self._a_stream.handle,
+                }
+            )
             # pylint: disable=protected-access
             self._receiver._get_audio_codec(a_header)
             # self._schedule_congestion()
 
     def add_packet(self, msg: bytes):
-        """Add Packet."""
-        packet = Packet.parse(msg, {"host_type": self._session.type})
-        if len(self._queue) >= self._queue.maxlen:
-            self._queue.clear()
-            self._waiting = True
-            _LOGGER.warning("AV Handler max queue size exceeded")
-            self._session.error = (
-                "Decoder could not keep up. Try lowering framerate / resolution"
-            )
-            self._session.stop()
-            return
-        if self._waiting and packet.unit_index == 0:
-            self._waiting = False
-        if not self._waiting:
-            self._queue.append(packet)
-
-    def process_packet(self):
-        """Process AV Packet."""
-        try:
-            packet = self._queue.popleft()
-        except IndexError:
-            time.sleep(0.0001)
-            return
-        packet.decrypt(self._cipher)
-        self._handle(packet)
+        """Add Packet. Packet is parsed in worker."""
+        if len(self._queue) >= self.MAX_QUEUE_SIZE:
+            self._handle_overflow()
+            if self._session.is_stopped:
+                return
+        self._queue.append(msg)
+        if not self._queue_event.is_set():
+            self._queue_event.set()
 
     def worker(self):
-        """Worker for AV Handler. Run in thread."""
-        while not self._session.is_stopped:
-            self.process_packet()
+        """Worker for AV Handler. Run in thread.
+
+        Handles up to `BATCH_SIZE` packets between checks of the session state.
+        Blocks until a packet is queued or `WAIT_TIMEOUT` has elapsed.
+        """
+        if self.RAISE_PRIORITY:
+            raise_thread_priority()
+
+        # Bind to locals to avoid attribute lookups per packet.
+        session = self._session
+        queue = self._queue
+        popleft = queue.popleft
+        queue_event = self._queue_event
+        cipher = self._cipher
+        get_stream = self._streams.get
+        parse = Packet.parse
+        params = {"host_type": session.type}
+        batch_size = self.BATCH_SIZE
+        wait_timeout = self.WAIT_TIMEOUT
+
+        while not session.is_stopped:
+            if not queue:
+                # Clear before checking again so a packet added in between is not missed.
+                queue_event.clear()
+                if not queue:
+                    queue_event.wait(wait_timeout)
+                continue
+            for _ in range(min(len(queue), batch_size)):
+                try:
+                    msg = popleft()
+                except IndexError:
+                    # Queue was cleared.
+                    break
+                packet = parse(msg, params)
+                packet.decrypt(cipher)
+                handle = get_stream(packet.type)
+                if handle is not None:
+                    handle(packet)
+        if self._congestion_handle is not None:
+            session.loop.call_soon_threadsafe(self._congestion_handle.cancel)
         _LOGGER.debug("Closing AV Receiver")
         self._receiver.close()
         self._queue.clear()
         _LOGGER.debug("AV Receiver Closed")
 
-    def _handle(self, packet: AVPacket):
-        # _LOGGER.debug(packet)
-        if not self._receiver:
-            return
-        if packet.type == AVPacket.Type.VIDEO:
-            stream = self._v_stream
-        else:
-            stream = self._a_stream
-        stream.handle(packet)
+    def _handle_overflow(self):
+        """Handle full queue. Stop session if overflowing persistently."""
+        now = time.monotonic()
+        if now - self._overflow_start > self.OVERFLOW_WINDOW:
+            self._overflow_start = now
+            self._overflow_count = 0
+            _LOGGER.warning("AV Handler max queue size exceeded. Dropping packets")
+        self._overflow_count += 1
+        if self._overflow_count > self.MAX_QUEUE_OVERFLOWS:
+            self._queue.clear()
+            _LOGGER.error("AV Handler queue overflowed repeatedly")
+            self._session.error = (
+                "Decoder could not keep up. Try lowering framerate / resolution"
+            )
+            self._session.stop()
 
     def _schedule_congestion(self):
-        self._session.loop.call_later(0.5, self._send_congestion)
+        # Schedule from the last send so the interval does not drift.
+        delay = self.CONGESTION_INTERVAL - (time.monotonic() - self._last_congestion)
+        self._congestion_handle = self._session.loop.call_later(
+            max(0, delay), self._send_congestion
+        )
 
     def _send_congestion(self):
         # TODO: Use or don't use?
-        now = time.time()
-        if now - self._last_congestion > 0.2 and not self._session.is_stopped:
-            self._session._sync_run_io(  # pylint: disable=protected-access
-                self._session.stream.send_congestion, self.received, self.lost
-            )
-            self._v_stream.reset_counters()
-            self._a_stream.reset_counters()
-            self._last_congestion = now
-            self._schedule_congestion()
+        self._congestion_handle = None
+        if self._session.is_stopped:
+            return
+        self._session._sync_run_io(  # pylint: disable=protected-access
+            self._session.stream.send_congestion, self.received, self.lost
+        )
+        self._v_stream.reset_counters()
+        self._a_stream.reset_counters()
+        self._last_congestion = time.monotonic()
+        self._schedule_congestion()
 
     def _send_corrupt(self, last_complete: int, current: int):
         """Handle corrupt frame.
@@ -153,37 +228,30 @@ class AVHandler:
         return self._v_stream.received + self._a_stream.received
 
 
-class AVStream:
-    """AV Stream."""
-
-    TYPE_VIDEO = "video"
-    TYPE_AUDIO = "audio"
+class AVStream(abc.ABC):
+    """Base Class for AV Stream. Abstract."""
 
     def __init__(
         self,
-        av_type: str,
         header: bytes,
         callback_done: Callable[[bytes], None],
         callback_corrupt: Callable[[int, int], None],
     ):
-        self._type = av_type
         self._callback_done = callback_done
         self._callback_corrupt = callback_corrupt
         self._header = header
-        self._packets = []
+        self._slots = []
+        self._present = 0
+        self._src_mask = 0
         self._frame = -1
         self._last_unit = -1
         self._lost = 0
         self._received = 0
         self._last_index = -1
         self._frame_bad_order = False
+        self._frame_done = False
         self._last_complete = 0
-        self._missing = []
-
-        if self._type not in [AVStream.TYPE_VIDEO, AVStream.TYPE_AUDIO]:
-            raise ValueError("Invalid Type")
-        if av_type == AVStream.TYPE_VIDEO:
-            self._header = b"".join([self._header, bytes(FFMPEG_PADDING)])
+        self._max_unit_size = 0
 
     def reset_counters(self):
         """Reset packet counters."""
@@ -191,14 +259,18 @@ class AVStream:
 
     def _set_new_frame(self, packet: AVPacket):
         self._frame_bad_order = False
-        self._missing = []
-        self._packets = []
+        self._frame_done = False
+        # Units are stored by unit index. Bits of present are set for received units.
+        self._slots = [b""] * packet.frame_length
+        self._present = 0
+        self._src_mask = (1 << packet.frame_length_src) - 1
+        self._max_unit_size = 0
         self._frame = packet.frame_index
         self._last_unit = -1
         # _LOGGER.debug("Started New Frame: %s", self.frame)
 
     def _handle_missing_packet(self, index: int, unit_index: int):
-        """Mark missing unit indexes as missing. Write null placeholder bytes for each."""
+        """Log units missing before unit index and add to lost count."""
         if not self._frame_bad_order:
             _LOGGER.warning(
                 "Received unit out of order: %s, expected: %s",
@@ -206,58 +278,43 @@ class AVStream:
                 self.last_unit + 1,
             )
             self._frame_bad_order = True
+        self._lost = (self._lost + index - self._last_index - 1) & 0xFFFF
+
+    @abc.abstractmethod
+    def _unit_data(self, packet: AVPacket) -> bytes:
+        """Return data of unit to store for frame."""
 
-        _range = range(self.last_unit + 1, unit_index)
-        for _ in _range:
-            self._packets.append(b"")
-        self._missing.extend(range(self.last_unit + 1, unit_index))
-        if self._lost > 65535:
-            self._lost = 0
-        self._lost += index - self._last_index - 1
-        if self._lost > 65535:
-            self._lost = 1
-        self._last_unit = unit_index - 1
+    @abc.abstractmethod
+    def _frame_data(self, packets: list[bytes], length: int) -> bytes:
+        """Return frame assembled from the first length packets."""
+
+    def _set_frame_done(self, packet: AVPacket):
+        self._frame_done = True
+        self._last_complete = packet.frame_index
+        self._callback_done(self._frame_data(self._slots, packet.frame_length_src))
 
     def _handle_src_packet(self, packet: AVPacket):
-        if packet.is_last_src and not self._frame_bad_order:
-            if len(self._packets) < packet.frame_length_src:
-                _LOGGER.error("Frame buffer missing packets")
-                return
-            self._last_complete = packet.frame_index
-
-            if self._type == AVStream.TYPE_AUDIO:
-                self._callback_done(b"".join(self._packets[: packet.frame_length_src]))
-            else:
-                # First two decrypted bytes is the difference of the unit size and the data size.
-                self._callback_done(
-                    self._header
-                    + b"".join(
-                        [
-                            packet[2:]
-                            for packet in self._packets[: packet.frame_length_src]
-                        ]
-                    )
-                )
+        # Frame is complete once all src units are received regardless of order.
+        if (self._present & self._src_mask) == self._src_mask:
+            self._set_frame_done(packet)
 
     def _handle_fec_packet(self, packet: AVPacket):
         try:
             import pyjerasure  # pylint: disable=import-outside-toplevel
         except ModuleNotFoundError:
             return
-        if not self._frame_bad_order and not self._missing:
-            # Ignore FEC packets if all src packets received.
-            return
         if packet.is_last:
-            if len(self._missing) <= packet.frame_length_fec:
-                matrix = pyjerasure.Matrix(
-                    "cauchy", packet.frame_length_src, packet.frame_length_fec, 8
+            slots = self._slots
+            missing_mask = ((1 << len(slots)) - 1) & ~self._present
+            # Count set bits. int.bit_count requires Python 3.10.
+            if bin(missing_mask).count("1") <= packet.frame_length_fec:
+                missing = _get_set_bits(missing_mask)
+                matrix = _get_fec_matrix(
+                    packet.frame_length_src, packet.frame_length_fec
                 )
                 restored = b""
-                packets = self._packets
-                max_size = max([len(packet) for packet in packets])
-                size = pyjerasure.align_size(matrix, max_size)
-                missing = tuple(self._missing)
-                buf = b"".join([packet.ljust(size, b"\x00") for packet in packets])
+                size = pyjerasure.align_size(matrix, self._max_unit_size)
+                buf = b"".join([slot.ljust(size, b"\x00") for slot in slots])
                 _LOGGER.debug("Attempting FEC Decode")
                 try:
                     restored = pyjerasure.decode_from_bytes(
@@ -270,53 +327,46 @@ class AVStream:
                     _LOGGER.error(err)
                     return
                 if restored:
-                    self._last_complete = packet.frame_index
                     _LOGGER.debug("FEC Successful")
                     for index in missing:
-                        packets[index] = restored[
+                        slots[index] = restored[
                             size * index : size * (index + 1)
                         ].rstrip(b"\x00")
-
-                    if self._type == AVStream.TYPE_AUDIO:
-                        self._callback_done(
-                            b"".join(packets[: packet.frame_length_src])
-                        )
-                    else:
-                        self._callback_done(
-                            self._header
-                            + b"".join(
-                                [
-                                    packet[2:]
-                                    for packet in packets[: packet.frame_length_src]
-                                ]
-                            )
-                        )
+                    self._set_frame_done(packet)
                 else:
                     _LOGGER.warning("FEC Failed")
 
     def handle(self, packet: AVPacket):
         """Handle Packet."""
-        if self._received > 65535:
-            self._received = 0
-        self._received += 1
-        if self._received > 65535:
-            self._received = 1
+        self._received = (self._received + 1) & 0xFFFF
 
         # New Video Frame.
-        if packet.frame_index != self.frame:
-            if self._last_complete + 1 != packet.frame_index:
-                self._callback_corrupt(self._last_complete + 1, packet.frame_index)
+        frame_index = packet.frame_index
+        if frame_index != self._frame:
+            if self._last_complete + 1 != frame_index:
+                self._callback_corrupt(self._last_complete + 1, frame_index)
             self._set_new_frame(packet)
+        elif self._frame_done:
+            # Ignore remaining FEC units if frame is complete.
+            return
 
+        unit_index = packet.unit_index
+        last_unit = self._last_unit
         # Check if packet is in order
-        if packet.unit_index != self.last_unit + 1:
-            self._handle_missing_packet(packet.index, packet.unit_index)
-
-        self._last_unit += 1
-        if self._type == AVStream.TYPE_AUDIO:
-            self._packets.append(packet.data[: packet.frame_size_audio])
-        else:
-            self._packets.append(packet.data)
+        if unit_index > last_unit:
+            if unit_index > last_unit + 1:
+                self._handle_missing_packet(packet.index, unit_index)
+            self._last_unit = unit_index
+
+        data = self._unit_data(packet)
+        slots = self._slots
+        if unit_index >= len(slots):
+            slots.extend([b""] * (unit_index + 1 - len(slots)))
+        slots[unit_index] = data
+        self._present |= 1 << unit_index
+        size = len(data)
+        if size > self._max_unit_size:
+            self._max_unit_size = size
 
         # Current Frame is src.
         if not packet.is_fec:
@@ -343,3 +393,37 @@ class AVStream:
     def received(self) -> int:
         """Return Total AV packets received."""
         return self._received
+
+
+class VideoStream(AVStream):
+    """Video Stream."""
+
+    def __init__(
+        self,
+        header: bytes,
+        callback_done: Callable[[bytes], None],
+        callback_corrupt: Callable[[int, int], None],
+    ):
+        super().__init__(header, callback_done, callback_corrupt)
+        self._header = b"".join([self._header, _PADDING])
+
+    def _unit_data(self, packet: AVPacket) -> bytes:
+        return packet.data
+
+    def _frame_data(self, packets: list[bytes], length: int) -> bytes:
+        # First two decrypted bytes is the difference of the unit size and the data size.
+        # Join header, units and decoder padding in one pass so the frame is only copied once.
+        parts = [packet[2:] for packet in packets[:length]]
+        parts.insert(0, self._header)
+        parts.append(_PADDING)
+        return b"".join(parts)
+
+
+class AudioStream(AVStream):
+    """Audio Stream."""
+
+    def _unit_data(self, packet: AVPacket) -> bytes:
+        return packet.data[: packet.frame_size_audio]
+
+    def _frame_data(self, packets: list[bytes], length: int) -> bytes:
+        return b"".join(packets[:length])
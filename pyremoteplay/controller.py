@@ -1,4 +1,5 @@
 """Controller methods."""
+
 from __future__ import annotations
 import logging
 import threading
@@ -162,13 +163,11 @@ class Controller:
         event.pack(buf)
         self._event_buf.appendleft(buf)
 
-    def _button(
+    def _parse_button(
         self,
         name: Union[str, FeedbackEvent.Type],
         action: Union[str, ButtonAction],
     ) -> tuple[FeedbackEvent.Type, ButtonAction]:
-        if not self._check_session():
-            return None
         if isinstance(action, self.ButtonAction):
             _action = action
         else:
@@ -185,15 +184,58 @@ class Controller:
             except KeyError:
                 _LOGGER.error("Invalid button: %s", name)
                 return None
+        return button, _action
 
-        if _action == self.ButtonAction.PRESS:
+    def _add_button_event(self, button: FeedbackEvent.Type, action: ButtonAction):
+        if action == self.ButtonAction.PRESS:
             self._add_event_buffer(FeedbackEvent(button, is_active=True))
-        elif _action == self.ButtonAction.RELEASE:
+        elif action == self.ButtonAction.RELEASE:
             self._add_event_buffer(FeedbackEvent(button, is_active=False))
-        elif _action == self.ButtonAction.TAP:
+        elif action == self.ButtonAction.TAP:
             self._add_event_buffer(FeedbackEvent(button, is_active=True))
+
+    def _button(
+        self,
+        name: Union[str, FeedbackEvent.Type],
+        action: Union[str, ButtonAction],
+    ) -> tuple[FeedbackEvent.Type, ButtonAction]:
+        if not self._check_session():
+            return None
+        data = self._parse_button(name, action)
+        if not data:
+            return None
+        self._add_button_event(*data)
         self._send_event()
-        return button, _action
+        return data
+
+    def button_events(
+        self,
+        events: Iterable[
+            tuple[Union[str, FeedbackEvent.Type], Union[str, ButtonAction]]
+        ],
+    ):
+        """Emulate pressing or releasing multiple buttons in order.
+
+        Each event is sent with the sequence advanced once per event,
+        the same as calling :meth:`button() <pyremoteplay.controller.Controller.button>`
+        for each event.
+        The `tap` action is not supported. Use `press` and `release` instead.
+
+        :param events: Iterable of tuples of button name and action.
+            See :meth:`button() <pyremoteplay.controller.Controller.button>`.
+        """
+        if not self._check_session():
+            return
+        for name, action in events:
+            data = self._parse_button(name, action)
+            if not data:
+                continue
+            if data[1] == self.ButtonAction.TAP:
+                _LOGGER.error("Action: tap is not supported for multiple buttons")
+                continue
+            self._add_button_event(*data)
+            # Host expects the event sequence to advance once per event.
+            self._send_event()
 
     def button(
         self,
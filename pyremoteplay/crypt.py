@@ -1,10 +1,11 @@
 """Common Crypto Methods."""
+
 import logging
-from struct import pack_into
 
 from Cryptodome.Cipher import AES
 from Cryptodome.Hash import HMAC, SHA256
 from Cryptodome.Random import get_random_bytes
+from Cryptodome.Util import Counter
 from Cryptodome.Util.strxor import strxor
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.asymmetric import ec
@@ -23,6 +24,7 @@ _LOGGER = logging.getLogger(__name__)
 
 GMAC_REFRESH_IV = 44910
 GMAC_REFRESH_KEY_POS = 45000
+IV_MASK = (1 << 128) - 1
 
 
 def get_gmac_key(gmac_index: int, key: bytes, init_vector: bytes) -> bytes:
@@ -85,23 +87,16 @@ def get_gmac_tag(data: bytes, key: bytes, init_vector: bytes) -> bytes:
     # return cipher.digest()
 
 
-def gen_iv_stream(buf: bytearray, init_vector: bytes, key_pos: int):
-    """Pack buf with stream of incremented IVs.
+def _get_ctr_cipher(key: bytes, init_vector: bytes, key_pos: int):
+    """Return AES CTR Cipher starting at the block of key position.
 
-    This concats the next block of IVs needed like AES CTR.
+    IV is a little endian counter. Same as counter_add.
     """
-    length = len(buf)
-    assert length % 16 == 0
-    blocks = length // 16
-    block_offset = (key_pos // 16) + 1  # Start at next block
-    stop = blocks + block_offset
-    current = 0
-    for block in range(block_offset, stop):
-        pack_into("!16s", buf, current, counter_add(block, init_vector))
-        current += 16
-
-
-# TODO: Make more efficient
+    start = (from_b(init_vector, "little") + (key_pos // 16) + 1) & IV_MASK
+    counter = Counter.new(128, initial_value=start, little_endian=True)
+    return AES.new(key, AES.MODE_CTR, counter=counter)
+
+
 def get_key_stream(
     key: bytes, init_vector: bytes, key_pos: int, data_len: int
 ) -> bytes:
@@ -109,23 +104,13 @@ def get_key_stream(
     padding = key_pos % 16
     key_pos = key_pos - padding
     assert key_pos % 16 == 0
-    key_stream_len = ((padding + data_len + 16 - 1) // 16) * 16
 
-    key_stream = bytearray(key_stream_len)
-    gen_iv_stream(key_stream, init_vector, key_pos)
-
-    # cipher = Cipher(algorithms.AES(key), modes.ECB())
-    # encryptor = cipher.encryptor()
-    # buf = bytearray(len(key_stream) + 15)
-    # len_encrypted = encryptor.update_into(key_stream, buf)
-    # key_stream = buf[:len_encrypted] + encryptor.finalize()
-
-    cipher = AES.new(key, AES.MODE_ECB)
-    key_stream = cipher.encrypt(key_stream)
+    # Encrypting zeros in CTR mode returns the key stream.
+    cipher = _get_ctr_cipher(key, init_vector, key_pos)
+    key_stream = cipher.encrypt(bytes(padding + data_len))
 
     # Align to the overflow of the block and truncate to match packet size.
-    key_stream = key_stream[padding : padding + data_len]
-    return key_stream
+    return key_stream[padding:]
 
 
 def decrypt_encrypt(
@@ -157,6 +142,7 @@ class BaseCipher:
         self.index = 0
         self.keystreams = []
         self.keystream_index = 0
+        self._key_stream_cipher = None
 
     def _init_cipher(self):
         self.base_key, self.base_iv = get_base_key_iv(
@@ -165,13 +151,18 @@ class BaseCipher:
         self.current_key = self.base_gmac_key = get_gmac_key(
             self.index, self.base_key, self.base_iv
         )
+        # Key streams are generated in order so one CTR cipher continues from the last.
+        self._key_stream_cipher = _get_ctr_cipher(
+            self.base_key,
+            self.base_iv,
+            self.keystream_index * BaseCipher.KEYSTREAM_LEN,
+        )
         self._next_key_stream()
 
     def _next_key_stream(self):
         while len(self.keystreams) < 3:
-            key_pos = self.keystream_index * BaseCipher.KEYSTREAM_LEN
-            key_stream = get_key_stream(
-                self.base_key, self.base_iv, key_pos, BaseCipher.KEYSTREAM_LEN
+            key_stream = self._key_stream_cipher.encrypt(
+                bytes(BaseCipher.KEYSTREAM_LEN)
             )
             self.keystreams.append((self.keystream_index, key_stream))
             self.keystream_index += 1
@@ -4,7 +4,6 @@ import logging
 from ssl import SSLError
 import asyncio
 from typing import Callable, Union
-import socket
 from functools import wraps
 import inspect
 import time
@@ -24,7 +23,7 @@ from .const import (
 )
 from .ddp import async_get_status, get_status, wakeup, STATUS_OK, search, async_search
 from .session import Session
-from .util import format_regist_key
+from .util import check_host, format_regist_key
 from .register import register, async_register
 from .controller import Controller
 from .profile import Profiles, UserProfile
@@ -48,19 +47,20 @@ def _status_to_device(hosts: list[dict]) -> list[RPDevice]:
 def _load_profiles(func: Callable):
     """Decorator. Load profiles if profiles is None."""
 
+    param = "profiles"
+    signature = inspect.signature(func)
+    if param not in signature.parameters:
+        raise ValueError(f"Method: {func} has no parameter '{param}'")
+    param_index = list(signature.parameters).index(param)
+
     @wraps(func)
     def wrapped(*args, **kwargs):
-        param = "profiles"
-        signature = inspect.signature(func)
         bound_args = signature.bind(*args, **kwargs)
         if not isinstance(bound_args.arguments.get("self"), RPDevice):
             raise TypeError(f"Can only wrap a {RPDevice} instance")
-        if param not in signature.parameters:
-            raise ValueError(f"Method: {func} has no parameter '{param}'")
 
         profiles = bound_args.arguments.get(param)
         if not profiles:
-            param_index = list(signature.parameters.keys()).index(param)
             # Remove profiles from arguments
             if param_index < len(bound_args.args):
                 _args = list(args)
@@ -125,7 +125,7 @@ class RPDevice:
         )
 
     def __init__(self, host: str):
-        socket.gethostbyname(host)  # Raise Exception if invalid
+        check_host(host)  # Raise Exception if invalid
 
         self._host = host
         self._max_polls = DEFAULT_POLL_COUNT
@@ -211,8 +211,12 @@ class RPDevice:
         if old_status != data:
             _LOGGER.debug("Status: %s", self.status)
             title_id = self.status.get("running-app-titleid")
-            if title_id and asyncio.get_event_loop().is_running:
-                asyncio.ensure_future(self._get_media_info(title_id))
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if title_id and loop is not None:
+                loop.create_task(self._get_media_info(title_id))
             else:
                 self._media_info = None
                 self._image = None
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 import abc
-from struct import unpack_from
+from struct import Struct
 import warnings
 import logging
 from collections import deque
@@ -15,6 +15,10 @@ if TYPE_CHECKING:
 
 _LOGGER = logging.getLogger(__name__)
 
+_PADDING = bytes(FFMPEG_PADDING)
+# Channels, bits, rate, frame size, unknown.
+_AUDIO_HEADER = Struct("!BBIII")
+
 try:
     import av
 except ModuleNotFoundError:
@@ -75,7 +79,7 @@ class AVReceiver(abc.ABC):
 
     @staticmethod
     def video_frame(
-        buf: bytes, codec_ctx: av.CodecContext, video_format="rgb24"
+        buf: bytes, codec_ctx: av.CodecContext, video_format="rgb24", padded=False
     ) -> av.VideoFrame:
         """Decode H264 Frame to raw image.
         Return AV Frame.
@@ -83,9 +87,12 @@ class AVReceiver(abc.ABC):
         :param buf: Raw Video Packet representing one video frame
         :param codec_ctx: av codec context for decoding
         :param video_format: Format to output frames as.
+        :param padded: If True, buf already ends with `FFMPEG_PADDING` zero bytes
         """
         frames = None
-        packet = av.packet.Packet(b"".join([buf, bytes(FFMPEG_PADDING)]))
+        if not padded:
+            buf = b"".join([buf, _PADDING])
+        packet = av.packet.Packet(buf)
         try:
             frames = codec_ctx.decode(packet)
         except av.error.InvalidDataError as error:
@@ -162,12 +169,13 @@ class AVReceiver(abc.ABC):
 
     def _get_audio_codec(self, header: bytes):
         """Get Audio config from header. Get Audio codec."""
+        channels, bits, rate, frame_size, unknown = _AUDIO_HEADER.unpack_from(header)
         self._audio_config = {
-            "channels": header[0],
-            "bits": header[1],
-            "rate": unpack_from("!I", header, 2)[0],
-            "frame_size": unpack_from("!I", header, 6)[0],
-            "unknown": unpack_from("!I", header, 10)[0],
+            "channels": channels,
+            "bits": bits,
+            "rate": rate,
+            "frame_size": frame_size,
+            "unknown": unknown,
         }
         self._audio_config["packet_size"] = (
             self._audio_config["channels"]
@@ -201,12 +209,14 @@ class AVReceiver(abc.ABC):
                 self._session.error = msg
                 self._session.stop()
 
-    def decode_video_frame(self, buf: bytes) -> av.VideoFrame:
+    def decode_video_frame(self, buf: bytes, padded=False) -> av.VideoFrame:
         """Return decoded Video Frame."""
         if not self._video_decoder:
             _LOGGER.warning("Video decoder not created.")
             return None
-        frame = AVReceiver.video_frame(buf, self._video_decoder, self.video_format)
+        frame = AVReceiver.video_frame(
+            buf, self._video_decoder, self.video_format, padded
+        )
         return frame
 
     def decode_audio_frame(self, buf: bytes) -> av.AudioFrame:
@@ -218,8 +228,8 @@ class AVReceiver(abc.ABC):
         return frame
 
     def handle_video_data(self, buf: bytes):
-        """Handle video data."""
-        frame = self.decode_video_frame(buf)
+        """Handle video data. Buf ends with `FFMPEG_PADDING` zero bytes."""
+        frame = self.decode_video_frame(buf, padded=True)
         if frame is not None:
             self.handle_video(frame)
 
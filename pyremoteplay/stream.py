@@ -42,6 +42,7 @@ DEFAULT_RTT = 1
 DEFAULT_MTU = 1454
 MIN_MTU = 576
 UDP_IPV4_SIZE = 28
+STREAM_RCVBUF_SIZE = 0x200000
 
 DATA_LENGTH = 26
 DATA_ACK_LENGTH = 29
@@ -64,6 +65,12 @@ class RPStream:
             """Callback for connection made."""
             _LOGGER.debug("Connected Stream")
             self.transport = transport
+            try:
+                self.socket.setsockopt(
+                    socket.SOL_SOCKET, socket.SO_RCVBUF, STREAM_RCVBUF_SIZE
+                )
+            except OSError as error:
+                _LOGGER.warning("Could not set stream receive buffer: %s", error)
 
         def datagram_received(self, data, addr):  # pylint: disable=unused-argument
             """Callback for data received"""
@@ -1,17 +1,30 @@
 """Utility Methods."""
 from __future__ import annotations
 import inspect
+import ipaddress
 import json
 import logging
+import os
 import pathlib
 import select
+import socket
+import sys
 import time
 from binascii import hexlify
+from functools import lru_cache
 
 from .const import CONTROLS_FILE, OPTIONS_FILE, PROFILE_DIR, PROFILE_FILE
 
+try:
+    import orjson
+except ModuleNotFoundError:
+    orjson = None
+
 _LOGGER = logging.getLogger(__name__)
 
+# Raw contents of config files keyed by path. Value is (mtime_ns, size, contents).
+_FILE_CACHE: dict[str, tuple[int, int, str]] = {}
+
 
 def check_dir() -> pathlib.Path:
     """Return path. Check file dir and create dir if not exists."""
@@ -28,79 +41,97 @@ def check_file(path: pathlib.Path):
             json.dump({}, _file)
 
 
-def get_mapping(path: str = "") -> dict:
-    """Return dict of key mapping."""
-    data = {}
+@lru_cache(maxsize=1)
+def _default_dir() -> pathlib.Path:
+    """Return default file dir. Created on first call."""
+    return check_dir()
+
+
+def _get_path(path: str, name: str) -> pathlib.Path:
+    """Return path or default path for file name."""
     if not path:
-        dir_path = check_dir()
-        path = dir_path / CONTROLS_FILE
-    else:
-        path = pathlib.Path(path)
-    check_file(path)
+        return _default_dir() / name
+    return pathlib.Path(path)
+
+
+def _loads(contents: str) -> dict:
+    """Return parsed JSON. Raises json.JSONDecodeError if invalid."""
+    if orjson is not None:
+        return orjson.loads(contents)
+    return json.loads(contents)
+
+
+def _dumps(data: dict, indent: bool = False) -> str:
+    """Return data serialized as JSON."""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else None
+        return orjson.dumps(data, option=option).decode("utf-8")
+    return json.dumps(data, indent=2 if indent else None)
+
+
+def _read_file(path: pathlib.Path) -> str:
+    """Return file contents. File is only read if changed since last read."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        check_file(path)
+        stat = path.stat()
+    cached = _FILE_CACHE.get(str(path))
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
     with open(path, "r", encoding="utf-8") as _file:
-        data = json.load(_file)
-    return data
+        contents = _file.read()
+    _FILE_CACHE[str(path)] = (stat.st_mtime_ns, stat.st_size, contents)
+    return contents
+
+
+def _write_file(path: pathlib.Path, contents: str):
+    """Write contents to file and cache."""
+    with open(path, "w", encoding="utf-8") as _file:
+        _file.write(contents)
+    stat = path.stat()
+    _FILE_CACHE[str(path)] = (stat.st_mtime_ns, stat.st_size, contents)
+
+
+def get_mapping(path: str = "") -> dict:
+    """Return dict of key mapping."""
+    path = _get_path(path, CONTROLS_FILE)
+    return _loads(_read_file(path))
 
 
 def write_mapping(mapping: dict, path: str = ""):
     """Write mapping."""
-    if not path:
-        path = pathlib.Path.home() / PROFILE_DIR / CONTROLS_FILE
-    else:
-        path = pathlib.Path(path)
-    with open(path, "w", encoding="utf-8") as _file:
-        json.dump(mapping, _file, indent=2)
+    path = _get_path(path, CONTROLS_FILE)
+    _write_file(path, _dumps(mapping, indent=True))
 
 
 def get_options(path: str = "") -> dict:
     """Return dict of options."""
-    data = {}
-    if not path:
-        dir_path = check_dir()
-        path = dir_path / OPTIONS_FILE
-    else:
-        path = pathlib.Path(path)
-    check_file(path)
-    with open(path, "r", encoding="utf-8") as _file:
-        data = json.load(_file)
-    return data
+    path = _get_path(path, OPTIONS_FILE)
+    return _loads(_read_file(path))
 
 
 def write_options(options: dict, path: str = ""):
     """Write options."""
-    if not path:
-        path = pathlib.Path.home() / PROFILE_DIR / OPTIONS_FILE
-    else:
-        path = pathlib.Path(path)
-    with open(path, "w", encoding="utf-8") as _file:
-        json.dump(options, _file)
+    path = _get_path(path, OPTIONS_FILE)
+    _write_file(path, _dumps(options))
 
 
 def get_profiles(path: str = "") -> dict:
     """Return Profiles."""
     data = {}
-    if not path:
-        dir_path = check_dir()
-        path = dir_path / PROFILE_FILE
-    else:
-        path = pathlib.Path(path)
-    check_file(path)
-    with open(path, "r", encoding="utf-8") as _file:
-        try:
-            data = json.load(_file)
-        except json.JSONDecodeError:
-            _LOGGER.error("Profiles file is corrupt: %s", path)
+    path = _get_path(path, PROFILE_FILE)
+    try:
+        data = _loads(_read_file(path))
+    except json.JSONDecodeError:
+        _LOGGER.error("Profiles file is corrupt: %s", path)
     return data
 
 
 def write_profiles(profiles: dict, path: str = ""):
     """Write profile data."""
-    if not path:
-        path = pathlib.Path.home() / PROFILE_DIR / PROFILE_FILE
-    else:
-        path = pathlib.Path(path)
-    with open(path, "w", encoding="utf-8") as _file:
-        json.dump(profiles, _file)
+    path = _get_path(path, PROFILE_FILE)
+    _write_file(path, _dumps(profiles))
 
 
 def get_users(device_id: str, profiles: dict = None, path: str = "") -> list[str]:
@@ -121,11 +152,10 @@ def add_regist_data(profile: dict, host_status: dict, data: dict) -> dict:
     """Add regist data to profile and return profile."""
     mac_address = host_status["host-id"]
     host_type = host_status["host-type"]
-    for key in list(data.keys()):
-        if key.startswith(host_type):
-            value = data.pop(key)
-            new_key = key.split("-")[1]
-            data[new_key] = value
+    data = {
+        key.split("-")[1] if key.startswith(host_type) else key: value
+        for key, value in data.items()
+    }
     profile["hosts"][mac_address] = {"data": data, "type": host_type}
     return profile
 
@@ -135,6 +165,23 @@ def format_regist_key(regist_key: str) -> str:
     return str(int.from_bytes(bytes.fromhex(bytes.fromhex(regist_key).decode()), "big"))
 
 
+@lru_cache(maxsize=32)
+def _resolve_host(host: str) -> str:
+    # Sockets are IPv4 only.
+    return socket.getaddrinfo(host, None, socket.AF_INET)[0][4][0]
+
+
+def check_host(host: str):
+    """Check that host is an IPv4 address or can be resolved to one.
+
+    Raises :class:`socket.gaierror` if host can not be resolved.
+    """
+    try:
+        ipaddress.IPv4Address(host)
+    except ValueError:
+        _resolve_host(host)
+
+
 def log_bytes(name: str, data: bytes):
     """Log bytes."""
     mod = inspect.getmodulename(inspect.stack()[1].filename)
@@ -172,6 +219,33 @@ def listener(name: str, sock, handle, stop_event):
     _LOGGER.info("%s Stopped", name)
 
 
+def raise_thread_priority():
+    """Raise priority of calling thread. Fails silently if not permitted."""
+    # pylint: disable=import-outside-toplevel
+    try:
+        if sys.platform.startswith("linux"):
+            # On Linux nice only applies to the calling thread.
+            os.nice(-5)
+        elif sys.platform == "darwin":
+            import ctypes
+
+            qos_class_user_interactive = 0x21
+            libc = ctypes.CDLL(None)
+            if libc.pthread_set_qos_class_self_np(qos_class_user_interactive, 0):
+                raise OSError("pthread_set_qos_class_self_np failed")
+        elif sys.platform == "win32":
+            import ctypes
+
+            thread_priority_highest = 2
+            kernel32 = ctypes.windll.kernel32
+            if not kernel32.SetThreadPriority(
+                kernel32.GetCurrentThread(), thread_priority_highest
+            ):
+                raise OSError("SetThreadPriority failed")
+    except (OSError, AttributeError) as error:
+        _LOGGER.debug("Could not raise thread priority: %s", error)
+
+
 def timeit(func):
     """Time Function."""
 
@@ -16,6 +16,7 @@ REQUIRES = list(open("requirements.txt"))
 REQUIRES_GUI = list(open("requirements-gui.txt"))
 REQUIRES_DEV = list(open("requirements-dev.txt"))
 REQUIRES_DEV.extend(REQUIRES_GUI)
+REQUIRES_FAST = ['uvloop; sys_platform != "win32"', "orjson"]
 
 CLASSIFIERS = [
     "Development Status :: 4 - Beta",
@@ -56,7 +57,11 @@ setup_kwargs = {
     "classifiers": CLASSIFIERS,
     "keywords": "playstation sony ps4 ps5 remote play remoteplay rp",
     "install_requires": REQUIRES,
-    "extras_require": {"GUI": REQUIRES_GUI, "DEV": REQUIRES_DEV},
+    "extras_require": {
+        "GUI": REQUIRES_GUI,
+        "DEV": REQUIRES_DEV,
+        "FAST": REQUIRES_FAST,
+    },
     "python_requires": ">={}".format(MIN_PY_VERSION),
     "test_suite": "tests",
     # "include_package_data": True,
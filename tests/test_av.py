@@ -0,0 +1,157 @@
+"""Tests for av.py."""
+# pylint: disable=protected-access
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from pyremoteplay import av
+from pyremoteplay.av import AVHandler, AudioStream, VideoStream
+from pyremoteplay.const import FFMPEG_PADDING
+
+HEADER = b"header"
+PADDING = bytes(FFMPEG_PADDING)
+FEC_UNIT = b"\xfe" * 8
+
+
+def _packets(
+    frame_index: int, units_src: list, units_fec: int = 0, frame_size_audio: int = 0
+) -> list:
+    """Return stub AV packets for one frame."""
+    length = len(units_src) + units_fec
+    packets = []
+    for unit_index in range(length):
+        is_fec = unit_index >= len(units_src)
+        packets.append(
+            SimpleNamespace(
+                index=unit_index,
+                frame_index=frame_index,
+                unit_index=unit_index,
+                frame_length=length,
+                frame_length_src=len(units_src),
+                frame_length_fec=units_fec,
+                is_fec=is_fec,
+                is_last=unit_index == length - 1,
+                frame_size_audio=frame_size_audio,
+                data=FEC_UNIT if is_fec else units_src[unit_index],
+            )
+        )
+    return packets
+
+
+def _video_unit(payload: bytes) -> bytes:
+    """Return video unit. First two bytes are not part of frame."""
+    return b"\x00\x00" + payload
+
+
+def _mock_pyjerasure(monkeypatch) -> MagicMock:
+    """Return mock pyjerasure module. Matrix cache is cleared."""
+    pyjerasure = MagicMock()
+    pyjerasure.align_size.side_effect = lambda matrix, size: size
+    monkeypatch.setitem(sys.modules, "pyjerasure", pyjerasure)
+    av._get_fec_matrix.cache_clear()
+    return pyjerasure
+
+
+def test_video_in_order():
+    """Test frame is completed once when units are received in order."""
+    frames = []
+    corrupt = MagicMock()
+    stream = VideoStream(HEADER, frames.append, corrupt)
+    payloads = [b"abc", b"def", b"ghi"]
+    for packet in _packets(1, [_video_unit(payload) for payload in payloads]):
+        stream.handle(packet)
+
+    # Header and frame are each followed by decoder padding.
+    assert frames == [HEADER + PADDING + b"abcdefghi" + PADDING]
+    assert stream.received == 3
+    assert stream.lost == 0
+    corrupt.assert_not_called()
+
+
+def test_video_out_of_order():
+    """Test frame is completed without FEC when src units are out of order."""
+    frames = []
+    stream = VideoStream(HEADER, frames.append, MagicMock())
+    packets = _packets(1, [_video_unit(b"abc"), _video_unit(b"def")], units_fec=1)
+    stream.handle(packets[1])
+    assert not frames
+    stream.handle(packets[0])
+
+    assert frames == [HEADER + PADDING + b"abcdef" + PADDING]
+
+
+def test_fec_ignored_when_done(monkeypatch):
+    """Test FEC units are ignored once all src units are received."""
+    pyjerasure = _mock_pyjerasure(monkeypatch)
+    frames = []
+    stream = VideoStream(HEADER, frames.append, MagicMock())
+    for packet in _packets(1, [_video_unit(b"abc")], units_fec=2):
+        stream.handle(packet)
+
+    assert len(frames) == 1
+    pyjerasure.decode_from_bytes.assert_not_called()
+
+
+def test_fec_missing(monkeypatch):
+    """Test missing unit indexes are passed to FEC and restored."""
+    pyjerasure = _mock_pyjerasure(monkeypatch)
+    units = [_video_unit(payload) for payload in (b"aaaaaa", b"bbbbbb", b"cccccc")]
+    size = len(units[0])
+    restored = b"".join(units + [FEC_UNIT] * 2)
+    pyjerasure.decode_from_bytes.return_value = restored
+    frames = []
+    stream = VideoStream(HEADER, frames.append, MagicMock())
+    packets = _packets(1, units, units_fec=2)
+    # Units 1 and 2 are lost.
+    for packet in (packets[0], packets[3], packets[4]):
+        stream.handle(packet)
+
+    matrix, buf, missing, unit_size = pyjerasure.decode_from_bytes.call_args.args
+    assert matrix is av._get_fec_matrix(3, 2)
+    assert missing == (1, 2)
+    assert unit_size == size
+    assert buf == units[0] + bytes(size * 2) + FEC_UNIT * 2
+    assert frames == [HEADER + PADDING + b"aaaaaabbbbbbcccccc" + PADDING]
+    av._get_fec_matrix.cache_clear()
+
+
+def test_audio_truncated():
+    """Test audio units are truncated to audio frame size."""
+    frames = []
+    stream = AudioStream(b"", frames.append, MagicMock())
+    for packet in _packets(1, [b"abcdXX", b"efghYY"], frame_size_audio=4):
+        stream.handle(packet)
+
+    assert frames == [b"abcdefgh"]
+
+
+class _AVHandler(AVHandler):
+    MAX_QUEUE_SIZE = 4
+    MAX_QUEUE_OVERFLOWS = 2
+    OVERFLOW_WINDOW = 1.0
+
+
+def test_add_packet_overflow(monkeypatch):
+    """Test oldest packets are dropped and session stops on repeated overflow."""
+    now = [100.0]
+    monkeypatch.setattr(av, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    session = MagicMock(is_stopped=False)
+    session.stop.side_effect = lambda: setattr(session, "is_stopped", True)
+    handler = _AVHandler(session)
+
+    for msg in range(6):
+        handler.add_packet(msg)
+    assert list(handler._queue) == [2, 3, 4, 5]
+    session.stop.assert_not_called()
+
+    # Overflows are counted again in a new window.
+    now[0] += 2
+    handler.add_packet(6)
+    handler.add_packet(7)
+    assert list(handler._queue) == [4, 5, 6, 7]
+    session.stop.assert_not_called()
+
+    handler.add_packet(8)
+    session.stop.assert_called_once()
+    assert session.error
+    assert not handler._queue
@@ -0,0 +1,57 @@
+"""Tests for controller.py."""
+# pylint: disable=protected-access
+from unittest.mock import MagicMock
+
+from pyremoteplay.controller import Controller
+from pyremoteplay.stream_packets import FeedbackEvent, FeedbackHeader
+
+
+def _mock_session():
+    session = MagicMock()
+    session.is_stopped = False
+    session.is_ready = True
+    return session
+
+
+def _event_bytes(button: FeedbackEvent.Type, is_active: bool) -> bytes:
+    buf = bytearray(FeedbackEvent.LENGTH)
+    FeedbackEvent(button, is_active=is_active).pack(buf)
+    return bytes(buf)
+
+
+def test_button_events():
+    """Test sequence advances once per event and buffer holds history."""
+    session = _mock_session()
+    controller = Controller(session)
+    events = [
+        ("cross", "press"),
+        ("cross", "release"),
+        ("circle", "press"),
+        ("circle", "release"),
+        ("square", "press"),
+        ("square", "release"),
+    ]
+    controller.button_events(events)
+
+    calls = session.stream.send_feedback.call_args_list
+    assert len(calls) == len(events)
+    for sequence, call in enumerate(calls):
+        assert call.args == (FeedbackHeader.Type.EVENT, sequence)
+    assert controller._sequence_event == len(events)
+
+    # Newest event is first. Oldest event is dropped once buffer is full.
+    expected = [
+        _event_bytes(FeedbackEvent.Type[name.upper()], action == "press")
+        for name, action in reversed(events)
+    ]
+    assert calls[-1].kwargs["data"] == b"".join(expected[: Controller.MAX_EVENTS])
+    assert calls[0].kwargs["data"] == expected[-1]
+
+
+def test_button_events_tap_skipped():
+    """Test tap action and invalid buttons do not advance sequence."""
+    session = _mock_session()
+    controller = Controller(session)
+    controller.button_events([("cross", "tap"), ("invalid", "press")])
+    session.stream.send_feedback.assert_not_called()
+    assert controller._sequence_event == 0
@@ -1,5 +1,7 @@
 # fmt: off
 """Tests for crypt.py."""
+from Cryptodome.Cipher import AES
+
 from pyremoteplay import crypt
 
 HANDSHAKE_KEY = bytes([
@@ -231,4 +233,42 @@ def test_encrypt():
     mock_enc = local_cipher.encrypt(payload)
     assert mock_enc == payload_enc
 
+
+def _expected_key_stream(key, init_vector, key_pos, data_len):
+    """Return key stream by encrypting each incremented IV with ECB."""
+    first = key_pos // 16 + 1  # Start at next block
+    last = (key_pos + data_len - 1) // 16 + 1
+    blocks = b"".join([
+        crypt.counter_add(block, init_vector) for block in range(first, last + 1)
+    ])
+    key_stream = AES.new(key, AES.MODE_ECB).encrypt(blocks)
+    padding = key_pos % 16
+    return key_stream[padding : padding + data_len]
+
+
+def test_get_key_stream(monkeypatch):
+    """Test CTR key stream matches ECB of incremented IVs.
+
+    Key stream spans a KEYSTREAM_LEN boundary and the IV wraps at 2^128.
+    """
+    key = bytes(range(16))
+    # Counter wraps to zero at the last block of the first key stream.
+    blocks = crypt.BaseCipher.KEYSTREAM_LEN // 16
+    init_vector = (2**128 - blocks).to_bytes(16, "little")
+    key_pos = crypt.BaseCipher.KEYSTREAM_LEN - 0x25
+    data_len = 0x60
+    expected = _expected_key_stream(key, init_vector, key_pos, data_len)
+
+    assert crypt.get_key_stream(key, init_vector, key_pos, data_len) == expected
+
+    monkeypatch.setattr(crypt, "get_base_key_iv", lambda *args: (key, init_vector))
+    cipher = crypt.RemoteCipher(HANDSHAKE_KEY, SECRET)
+    assert cipher.get_key_stream(key_pos, data_len) == expected
+    # Queued key streams continue the same counter.
+    start = cipher.keystreams[0][0] * crypt.BaseCipher.KEYSTREAM_LEN
+    key_streams = b"".join([key_stream for _, key_stream in cipher.keystreams])
+    assert key_streams == _expected_key_stream(
+        key, init_vector, start, len(key_streams)
+    )
+
 # fmt: on
@@ -0,0 +1,26 @@
+"""Tests for pyremoteplay/__init__.py."""
+# pylint: disable=protected-access
+import subprocess
+import sys
+
+import pytest
+
+import pyremoteplay
+
+
+def test_submodules():
+    """Test submodules resolve after importing only the package."""
+    # Run in a new interpreter so submodules are not already imported.
+    code = (
+        "import pyremoteplay\n"
+        f"for name in {pyremoteplay._SUBMODULES!r}:\n"
+        "    getattr(pyremoteplay, name)\n"
+        "pyremoteplay.RPDevice\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_missing_attribute():
+    """Test unknown attribute raises AttributeError."""
+    with pytest.raises(AttributeError):
+        pyremoteplay.missing  # pylint: disable=pointless-statement